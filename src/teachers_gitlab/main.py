@@ -13,7 +13,9 @@ student and massively fork, clone or upload files to them.
 
 import argparse
 import collections
+import concurrent.futures
 import csv
+import hashlib
 import http
 import json
 import locale
@@ -21,8 +23,10 @@ import logging
 import os
 import pathlib
 import re
+import string
 import sys
 import textwrap
+import threading
 
 import gitlab
 
@@ -49,13 +53,9 @@ def register_command(name, brief=None):
         })
         func._command_name = name
 
-        def wrapper(*args, **kwargs):
-            """
-            Wrapper calling the original function.
-            """
-            return func(*args, **kwargs)
-
-        return wrapper
+        # Return the function itself: a pass-through wrapper would only
+        # add a call frame and hide the annotations the parser reads.
+        return func
 
     return decorator
 
@@ -129,11 +129,94 @@ class IntrospectionParameter(Parameter):
         return parsed_options.parser
 
 
+_template_formatter = string.Formatter()
+
+
+def template_field_names(template):
+    """
+    Return the root entry fields referenced by a format template.
+    """
+
+    names = []
+    for _, field_name, _, _ in _template_formatter.parse(template):
+        if not field_name:
+            continue
+        root = field_name.split('.')[0].split('[')[0]
+        if root not in names:
+            names.append(root)
+    return names
+
+
+def compile_template(template):
+    """
+    Precompile a str.format template into an expansion callable.
+
+    str.format re-parses the template string on every call. Bulk actions
+    expand the same template once per CSV row, so we parse it once and
+    replay the parsed segments instead.
+    """
+
+    segments = list(_template_formatter.parse(template))
+    if any(spec and ('{' in spec) for _, _, spec, _ in segments):
+        # Nested format specs need the full vformat machinery.
+        return lambda **kwargs: template.format(**kwargs)
+
+    def expand(**kwargs):
+        chunks = []
+        for literal_text, field_name, format_spec, conversion in segments:
+            if literal_text:
+                chunks.append(literal_text)
+            if field_name is None:
+                continue
+            obj, _ = _template_formatter.get_field(field_name, (), kwargs)
+            obj = _template_formatter.convert_field(obj, conversion)
+            chunks.append(_template_formatter.format_field(obj, format_spec))
+        return ''.join(chunks)
+
+    return expand
+
+
+def for_each_concurrently(pairs, concurrency, action):
+    """
+    Run an action over (entry, object) pairs in a thread pool.
+
+    The per-project bodies of the bulk actions are dominated by network
+    round-trips, so running them concurrently overlaps the waiting.
+    Failures the action does not handle itself propagate to the caller
+    once the submitted work has drained.
+
+    :param pairs: iterable of argument tuples, one per action call
+    :param concurrency: maximum number of concurrent action calls
+    :param action: callable invoked with each tuple unpacked
+    """
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(action, *pair) for pair in pairs]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+
 class ActionEntries:
-    def __init__(self, entries: list):
-        self.entries = entries
+    #: Default number of concurrent API requests when resolving entries.
+    DEFAULT_CONCURRENCY = 16
+
+    def __init__(self, entries, concurrency: int = DEFAULT_CONCURRENCY):
+        """
+        :param entries: list of entries or a callable producing such list
+            (the callable is invoked lazily on first access)
+        """
+        self._entries = None if callable(entries) else entries
+        self._entries_loader = entries if callable(entries) else None
+        self.concurrency = max(1, concurrency)
+        self.users_by_login = {}
         self.logger = logging.getLogger('action-entries')
 
+    @property
+    def entries(self):
+        if (self._entries is None) and self._entries_loader:
+            self._entries = self._entries_loader()
+        return self._entries
+
     def as_items(self):
         """
         Return entries as-is.
@@ -141,10 +224,24 @@ class ActionEntries:
         for entry in self.entries:
             yield entry
 
+    def _lookup_gitlab_user(self, glb: gitlab.client.Gitlab, user_login: str):
+        cache = mg.get_lookup_cache(glb)
+        if cache and (attributes := cache.get('users', user_login)):
+            return gitlab.v4.objects.User(glb.users, attributes)
+
+        # A username filter matches at most one user, so ask for a
+        # single-item page instead of a default-sized one.
+        matching_users = glb.users.list(username=user_login, per_page=1, iterator=True)
+        user_object = next(matching_users, None)
+        if cache and user_object:
+            cache.put('users', user_login, user_object.attributes)
+        return user_object
+
     def as_gitlab_user(self, entry, glb: gitlab.client.Gitlab, login_column: str):
         if user_login := entry.get(login_column):
-            matching_users = glb.users.list(username=user_login, iterator=True)
-            if user_object := next(matching_users, None):
+            if user_login not in self.users_by_login:
+                self.users_by_login[user_login] = self._lookup_gitlab_user(glb, user_login)
+            if user_object := self.users_by_login[user_login]:
                 return user_object
             else:
                 self.logger.warning(f"User {user_login} not found.")
@@ -162,16 +259,35 @@ class ActionEntries:
         login obtained from entry login column. For users that do not
         exist, None is returned and a warning message is printed.
 
+        Each unique login is resolved through the API exactly once, with
+        the lookups running concurrently; the results are cached for
+        later as_gitlab_user() calls.
+
         :param glb: GitLab instance to use
         :param login_column: name of the entry column containing user login
         :return: generator of (entry, user)
         """
+        unresolved_logins = list(dict.fromkeys(
+            user_login
+            for entry in self.entries
+            if (user_login := entry.get(login_column))
+            and (user_login not in self.users_by_login)
+        ))
+        if unresolved_logins:
+            workers = min(self.concurrency, len(unresolved_logins))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                found_users = pool.map(
+                    lambda login: self._lookup_gitlab_user(glb, login),
+                    unresolved_logins
+                )
+                self.users_by_login.update(zip(unresolved_logins, found_users))
+
         for entry in self.entries:
             yield entry, self.as_gitlab_user(entry, glb, login_column)
 
     def as_gitlab_projects(
         self, glb: gitlab.client.Gitlab, project_template: str,
-        allow_duplicates: bool = False
+        allow_duplicates: bool = False, lazy: bool = False
     ):
         """
         Converts entries to GitLab projects.
@@ -181,31 +297,77 @@ class ActionEntries:
         For projects that cannot be found, None is returned and a warning
         message is printed.
 
+        Project lookups are blocking API round-trips and therefore run
+        concurrently (see :self.concurrency:), entries are still produced
+        in their original order.
+
+        With :lazy:, no lookups are made at all: write-only actions do
+        not need the project attributes, so they get lazy objects and
+        non-existing projects surface as errors of the write calls.
+
         :param glb: GitLab instance to use
         :param project_template: template for generating project names using entry data
         :param allow_duplicates: whether to return duplicate projects, defaults to False
+        :param lazy: skip the lookups and produce lazy project objects
         :return: generator of (entry, project)
         """
 
-        projects_by_path = {}
+        lookup_cache = mg.get_lookup_cache(glb)
+
+        def lookup_project(path):
+            if lazy:
+                project = glb.projects.get(path, lazy=True)
+                project.path_with_namespace = path
+                return project
+            try:
+                return mg.get_canonical_project(glb, path, cache=lookup_cache)
+            except gitlab.exceptions.GitlabGetError:
+                self.logger.warning(f"Project '{path}' not found.")
+                return None
+
+        # Entries sharing the values of the fields the template actually
+        # uses expand to the same path, so expand each combination once.
+        expand_path = compile_template(project_template)
+        field_names = template_field_names(project_template)
+        path_by_fields = {}
+        entry_paths = []
         for entry in self.entries:
-            project_path = project_template.format(**entry)
-            if project := projects_by_path.get(project_path):
-                # We have seen the project before, but will return it only if
-                # we allow duplicates to be produced. Otherwise, move on.
-                if allow_duplicates:
-                    yield entry, project
+            fields_key = tuple(str(entry.get(name)) for name in field_names)
+            if (project_path := path_by_fields.get(fields_key)) is None:
+                project_path = expand_path(**entry)
+                path_by_fields[fields_key] = project_path
+            entry_paths.append(project_path)
+
+        # Resolve each unique path exactly once, overlapping the API
+        # round-trips in a thread pool.
+        unique_paths = list(dict.fromkeys(entry_paths))
+        projects_by_path = {}
+        if lazy:
+            # Constructing lazy objects involves no IO, no pool needed.
+            projects_by_path = {
+                path: lookup_project(path) for path in unique_paths
+            }
+        elif unique_paths:
+            workers = min(self.concurrency, len(unique_paths))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                projects_by_path = dict(
+                    zip(unique_paths, pool.map(lookup_project, unique_paths))
+                )
 
+        produced_paths = set()
+        for entry, project_path in zip(self.entries, entry_paths):
+            project = projects_by_path.get(project_path)
+            if not project:
+                # Lookup failed (and a warning was already printed).
                 continue
 
-            # We have not seen the project before, look it up.
-            try:
-                project = mg.get_canonical_project(glb, project_path)
-                projects_by_path[project_path] = project
-                yield entry, project
+            if not allow_duplicates:
+                if project_path in produced_paths:
+                    # We have seen the project before, move on.
+                    continue
+                produced_paths.add(project_path)
 
-            except gitlab.exceptions.GitlabGetError:
-                self.logger.warning(f"Project '{project_path}' not found.")
+            yield entry, project
 
 
 class ActionEntriesParameter(Parameter):
@@ -225,21 +387,32 @@ class ActionEntriesParameter(Parameter):
             metavar='LIST.csv',
             help='CSV with entries on which to perform an action'
         )
+        subparser.add_argument(
+            '--concurrency',
+            default=ActionEntries.DEFAULT_CONCURRENCY,
+            type=int,
+            dest='entries_concurrency',
+            metavar='N',
+            help='Number of concurrent API requests when resolving entries.'
+        )
 
     def get_value(self, argument_name, glb, parsed_options):
-        def _load_entries(csv_file):
+        def _read_entries(csv_file):
             reader = csv.DictReader(csv_file)
             logger.debug(f"Loaded entries with columns {reader.fieldnames}")
             return list(reader)
 
-        logger = logging.getLogger('action-entries')
-        if (parsed_options.entries_csv == '-'):
-            entries = _load_entries(sys.stdin)
-        else:
+        def _load_entries():
+            # Invoked lazily: the CSV is not parsed until the action
+            # actually asks for the entries.
+            if (parsed_options.entries_csv == '-'):
+                return _read_entries(sys.stdin)
             with open(parsed_options.entries_csv) as entries_csv:
-                entries = _load_entries(entries_csv)
+                return _read_entries(entries_csv)
+
+        logger = logging.getLogger('action-entries')
 
-        return ActionEntries(entries)
+        return ActionEntries(_load_entries, parsed_options.entries_concurrency)
 
 
 class ActionParameter(Parameter):
@@ -317,6 +490,11 @@ class RequiredProjectActionParameter(ActionParameter):
         )
 
 
+# Computed once: the available access levels are fixed and every
+# AccessLevelActionParameter instance offers the same choices.
+_ACCESS_LEVEL_NAMES = tuple(level.name for level in gitlab.const.AccessLevel)
+
+
 class AccessLevelActionParameter(ActionParameter):
     """
     Parameter annotation to create an access level action parameter.
@@ -326,7 +504,7 @@ class AccessLevelActionParameter(ActionParameter):
         ActionParameter.__init__(
             self, name,
             # Provide available access level names as choices.
-            choices=[level.name for level in list(gitlab.const.AccessLevel)],
+            choices=_ACCESS_LEVEL_NAMES,
             # Accept both lower and upper case access level names.
             type=str.upper,
             **kwargs
@@ -432,16 +610,21 @@ class CommandParser:
             description=short_help,
             parents=[self.args_common]
         )
-        for dest, param in callback_func.__annotations__.items():
+        # Snapshot the annotation-driven parameter plan once: the same
+        # list drives both registration and later value resolution, so
+        # the annotations are not re-introspected on every invocation.
+        annotated_params = list(callback_func.__annotations__.items())
+        for dest, param in annotated_params:
             param.register(dest, parser)
 
-        def wrapper(glb, cfg, callback):
-            kwargs = {}
-            for dest, param in callback.__annotations__.items():
-                kwargs[dest] = param.get_value(dest, glb, cfg)
-            callback(**kwargs)
+        def wrapper(glb, cfg):
+            kwargs = {
+                dest: param.get_value(dest, glb, cfg)
+                for dest, param in annotated_params
+            }
+            callback_func(**kwargs)
 
-        parser.set_defaults(func=lambda glb, cfg: wrapper(glb, cfg, callback_func))
+        parser.set_defaults(func=wrapper)
         parser.set_defaults(command_name_=name)
         parser.set_defaults(parser=self)
 
@@ -470,10 +653,20 @@ class CommandParser:
             self.subcommands[subcommand].print_help()
 
     def get_gitlab_instance(self):
-        return gitlab.Gitlab.from_config(
+        glb = gitlab.Gitlab.from_config(
             self.parsed_options.gitlab_instance,
             self.parsed_options.gitlab_config_file
         )
+        # Keep one connection per worker alive across the whole action.
+        mg.tune_connection_pool(
+            glb.session,
+            getattr(
+                self.parsed_options,
+                'entries_concurrency',
+                ActionEntries.DEFAULT_CONCURRENCY
+            )
+        )
+        return glb
 
 
 @register_command('accounts', 'Validate accounts existence')
@@ -498,44 +691,52 @@ def action_accounts(
     """
     List accounts that were not found.
     """
-    users = list(entries.as_gitlab_users(glb, login_column))
+    # Count while streaming instead of materializing the whole list;
+    # remember missing logins for the renamed-accounts pass so they are
+    # not resolved a second time.
+    entries_total = 0
+    users_found = 0
+    missing_logins = []
+    for entry, user in entries.as_gitlab_users(glb, login_column):
+        entries_total += 1
+        if user:
+            users_found += 1
+        elif user_login := entry.get(login_column):
+            missing_logins.append(user_login)
+
     if check_renamed_accounts:
-        for entry in entries.as_items():
-            if not (user_login := entry.get(login_column)):
-                continue
-            matching_users = glb.users.list(username=user_login, iterator=True)
-            if next(matching_users, None):
-                continue
+        for user_login in missing_logins:
             for suffix in ['1', '2', '3', '11']:
                 login_with_suffix = user_login + suffix
-                matching_users = glb.users.list(username=login_with_suffix, iterator=True)
+                matching_users = glb.users.list(username=login_with_suffix, per_page=1, iterator=True)
                 if not (user_obj := next(matching_users, None)):
                     continue
                 logger.warning("User %s not found, but account for %s exists.", user_login, login_with_suffix)
     if show_summary:
-        entries_total = len(users)
-        users_found = len([u for _, u in users if u])
         print('Total: {}, Not-found: {}, Ok: {}'.format(
             entries_total, entries_total - users_found, users_found
         ))
 
 
-def get_regex_blacklist_filter(blacklist_re, func):
-    def accept_all(_):
-        return True
+def get_commit_author_email_filter(blacklist):
+    """
+    Build a commit filter rejecting blacklisted author e-mails.
+
+    The regular expression is compiled exactly once here; the returned
+    filter then runs per commit without further indirection. Without a
+    blacklist, None is returned so that callers can fall back to
+    server-side-only filtering.
+    """
 
-    def reject_blacklist_matches(obj):
-        return not blacklist_pattern.fullmatch(func(obj))
+    if not blacklist:
+        return None
 
-    if blacklist_re:
-        blacklist_pattern = re.compile(blacklist_re)
-        return reject_blacklist_matches
-    else:
-        return accept_all
+    blacklist_pattern = re.compile(blacklist)
 
+    def reject_blacklist_matches(commit):
+        return not blacklist_pattern.fullmatch(commit.author_email)
 
-def get_commit_author_email_filter(blacklist):
-    return get_regex_blacklist_filter(blacklist, lambda commit: commit.author_email)
+    return reject_blacklist_matches
 
 
 @register_command('clone', 'Clone a project to a local directory')
@@ -572,6 +773,13 @@ def action_clone(
         default=None,
         metavar='BLACKLIST',
         help='Commit authors to ignore (regular expression).'
+    ),
+    shallow_depth: ActionParameter(
+        'shallow-depth',
+        default=None,
+        type=int,
+        metavar='DEPTH',
+        help='Clone only the last DEPTH commits (full history if needed).'
     )
 ):
     """
@@ -581,17 +789,37 @@ def action_clone(
     # FIXME: commit and deadline are mutually exclusive
 
     commit_filter = get_commit_author_email_filter(blacklist)
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
+
+    def clone_one(entry, project):
         if commit_template:
-            last_commit = project.commits.get(commit_template.format(**entry))
+            last_commit = project.commits.get(commit_template.format_map(entry))
         else:
             last_commit = mg.get_commit_before_deadline(
                 glb, project, deadline, branch, commit_filter
             )
 
-        local_path = local_path_template.format(**entry)
-        mg.clone_or_fetch(glb, project, local_path)
-        mg.reset_to_commit(local_path, last_commit.id)
+        local_path = local_path_template.format_map(entry)
+        mg.clone_or_fetch(glb, project, local_path, depth=shallow_depth)
+        try:
+            mg.reset_to_commit(local_path, last_commit.id)
+        except Exception:
+            # Unshallowing only makes sense when the local repository
+            # really is shallow: an earlier run may have cloned it in
+            # full (the fetch path ignores the depth).
+            if not (shallow_depth and mg.is_shallow_repository(local_path)):
+                raise
+            # The target commit is older than the shallow window:
+            # complete the history and retry.
+            mg.unshallow(local_path)
+            mg.reset_to_commit(local_path, last_commit.id)
+
+    # Cloning is dominated by network wait, both in the API calls and in
+    # the git subprocesses, so run the per-project work concurrently.
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template),
+        entries.concurrency,
+        clone_one
+    )
 
 @register_command('create-group', 'Create new group')
 def create_group(
@@ -615,14 +843,14 @@ def create_group(
         logger.fatal("Group path could not start with /.")
         return
     for entry in entries.as_items():
-        group_path = path_template.format(**entry)
+        group_path = path_template.format_map(entry)
 
         if mg.is_existing_group(glb, group_path):
             logger.info("Group %s already exists.", group_path)
             continue
 
         if group_name_template:
-            group_name = group_name_template.format(**entry)
+            group_name = group_name_template.format_map(entry)
         else:
             group_name = path_name
 
@@ -689,17 +917,27 @@ def action_fork(
     Fork one (or more) repositories multiple times.
     """
 
-    for entry, user in entries.as_gitlab_users(glb, login_column):
-        if not user and not include_nonexistent:
-            # Skip forking for non-existent users
-            continue
+    pairs = [
+        (entry, user)
+        for entry, user in entries.as_gitlab_users(glb, login_column)
+        if user or include_nonexistent
+    ]
+
+    # Typically all entries fork the same parent project; resolve each
+    # distinct parent path only once, before the workers start.
+    from_projects_by_path = {}
+    for entry, _ in pairs:
+        from_path = from_project_template.format_map(entry)
+        if from_path not in from_projects_by_path:
+            from_projects_by_path[from_path] = mg.get_canonical_project(glb, from_path)
 
-        from_project = mg.get_canonical_project(glb, from_project_template.format(**entry))
+    def fork_one(entry, user):
+        from_project = from_projects_by_path[from_project_template.format_map(entry)]
 
         user_name = user.username if user else entry.get(login_column)
-        to_full_path = to_project_template.format(**entry)
-        to_namespace = os.path.dirname(to_full_path)
-        to_name = os.path.basename(to_full_path)
+        to_full_path = to_project_template.format_map(entry)
+        # Project paths always use '/', no need for two os.path calls.
+        to_namespace, _, to_name = to_full_path.rpartition('/')
 
         logger.info(
             "Forking %s to %s/%s for user %s",
@@ -713,6 +951,11 @@ def action_fork(
         if hide_fork:
             mg.remove_fork_relationship(glb, to_project)
 
+    # The slow part is waiting for each fork to materialize; overlapping
+    # the per-entry bodies turns the N sequential polling loops into a
+    # handful of concurrent ones.
+    for_each_concurrently(pairs, entries.concurrency, fork_one)
+
 
 @register_command('protect', 'Protect a Git branch')
 def action_protect_branch(
@@ -751,7 +994,7 @@ def action_protect_branch(
     Set branch protection on multiple projects.
     """
 
-    for _, project in entries.as_gitlab_projects(glb, project_template):
+    def protect_one(_, project):
         logger.info(
             "Protecting branch '%s' in %s",
             branch_name, project.path_with_namespace
@@ -765,6 +1008,12 @@ def action_protect_branch(
         except gitlab.GitlabError as exp:
             logger.error("- Failed to protect branch: %s", exp)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, lazy=True),
+        entries.concurrency,
+        protect_one
+    )
+
 
 def _project_protect_branch(project, branch_name, merge_access_level, push_access_level, logger):
     def branch_get_merge_access_level(branch):
@@ -817,7 +1066,7 @@ def action_unprotect_branch(
     Unprotect branch on multiple projects.
     """
 
-    for _, project in entries.as_gitlab_projects(glb, project_template):
+    def unprotect_one(_, project):
         logger.info(
             "Unprotecting branch '%s' in %s",
             branch_name, project.path_with_namespace
@@ -828,6 +1077,12 @@ def action_unprotect_branch(
         except gitlab.GitlabError as exp:
             logger.error("- Failed to unprotect branch: %s", exp)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, lazy=True),
+        entries.concurrency,
+        unprotect_one
+    )
+
 
 def _project_unprotect_branch(project, branch_name, logger):
     if protected_branch := _project_get_protected_branch(project, branch_name):
@@ -837,11 +1092,14 @@ def _project_unprotect_branch(project, branch_name, logger):
 
 
 def _project_get_protected_branch(project, branch_name):
-    try:
-        return project.protectedbranches.get(branch_name)
-    except gitlab.exceptions.GitlabGetError:
-        # There is no such protected branch.
-        return None
+    # One listing returns the whole (typically tiny) protection state,
+    # so the common case of an unprotected branch does not pay for a
+    # 404 response and the exception that goes with it.
+    protected_branches = project.protectedbranches.list(iterator=True)
+    return next(
+        (branch for branch in protected_branches if branch.name == branch_name),
+        None
+    )
 
 
 @register_command('create-tag', 'Create a Git tag')
@@ -873,8 +1131,8 @@ def action_create_tag(
     Create a tag on a given commit or branch tip.
     """
 
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
-        ref_name = ref_name_template.format(**entry)
+    def create_tag_one(entry, project):
+        ref_name = ref_name_template.format_map(entry)
         params = {
             'tag_name': tag_name,
             'ref': ref_name,
@@ -893,7 +1151,18 @@ def action_create_tag(
             if (exp.response_code == http.HTTPStatus.BAD_REQUEST) and exp.error_message.endswith("already exists"):
                 pass
             else:
-                raise
+                # With lazy projects a bad project path surfaces here
+                # instead of during the lookup: log and keep going so
+                # one broken row does not abort the whole bulk run.
+                logger.error("- Failed to create tag: %s", exp)
+        except gitlab.GitlabError as exp:
+            logger.error("- Failed to create tag: %s", exp)
+
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, lazy=True),
+        entries.concurrency,
+        create_tag_one
+    )
 
 
 @register_command('protect-tag', 'Set tag protection')
@@ -930,7 +1199,7 @@ def action_protect_tag(
     Set tag protection on multiple projects.
     """
 
-    for _, project in entries.as_gitlab_projects(glb, project_template):
+    def protect_tag_one(_, project):
         logger.info(
             "Protecting tag '%s' in %s",
             tag_name, project.path_with_namespace
@@ -941,6 +1210,12 @@ def action_protect_tag(
         except gitlab.GitlabError as exp:
             logger.error("- Failed to protect tag: %s", exp)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, lazy=True),
+        entries.concurrency,
+        protect_tag_one
+    )
+
 
 def _project_protect_tag(project, tag_name, create_access_level, logger):
     def tag_get_create_access_level(tag):
@@ -987,7 +1262,7 @@ def action_unprotect_tag(
     Unset tag protection on multiple projects.
     """
 
-    for _, project in entries.as_gitlab_projects(glb, project_template):
+    def unprotect_tag_one(_, project):
         logger.info(
             "Unprotecting tag '%s' in %s",
             tag_name, project.path_with_namespace
@@ -998,6 +1273,12 @@ def action_unprotect_tag(
         except gitlab.GitlabError as exp:
             logger.error("- Failed to unprotect tag: %s", exp)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, lazy=True),
+        entries.concurrency,
+        unprotect_tag_one
+    )
+
 
 def _project_unprotect_tag(project, tag_name, logger):
     if protected_tag := _project_get_protected_tag(project, tag_name):
@@ -1007,11 +1288,12 @@ def _project_unprotect_tag(project, tag_name, logger):
 
 
 def _project_get_protected_tag(project, tag_name):
-    try:
-        return project.protectedtags.get(tag_name)
-    except gitlab.exceptions.GitlabGetError:
-        # There is no such protected tag.
-        return None
+    # See _project_get_protected_branch for why this is a listing.
+    protected_tags = project.protectedtags.list(iterator=True)
+    return next(
+        (tag for tag in protected_tags if tag.name == tag_name),
+        None
+    )
 
 
 @register_command('get-members', 'Get project members')
@@ -1037,9 +1319,14 @@ def action_members(
     project = mg.get_canonical_project(glb, project)
     members = project.members_all if inherited else project.members
 
-    print('login,name')
-    for member in members.list(all=True, iterator=True):
-        print(f"{member.username},{member.name}")
+    # A csv.writer batches the rows through one buffered write and also
+    # quotes names that happen to contain commas.
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(['login', 'name'])
+    writer.writerows(
+        (member.username, member.name)
+        for member in members.list(per_page=100, all=True, iterator=True)
+    )
 
 
 @register_command('add-member', 'Add a project member')
@@ -1060,48 +1347,71 @@ def action_add_member(
     Add members to multiple projects.
     """
 
-    for entry, project in entries.as_gitlab_projects(glb, project_template, allow_duplicates=True):
-        if user := entries.as_gitlab_user(entry, glb, login_column):
-            logger.info(
-                "Adding %s (%s) to %s",
-                user.username, access_level.name, project.path_with_namespace
-            )
-
-            if dry_run:
-                continue
-
-            try:
-                _project_add_member(project, user, access_level, logger)
-            except gitlab.GitlabError as exp:
-                logger.error("- Failed to add member: %s", exp)
-
+    # One membership listing per project replaces a write (and possibly
+    # a get) per row for members that are already in place, which is
+    # the common case when the action is re-run over the same roster.
+    member_levels_by_project = {}
+    member_locks_by_project = {}
+    member_levels_lock = threading.Lock()
+
+    def get_member_levels(project):
+        project_id = project.get_id()
+        # The global lock only guards the dictionaries: holding it
+        # across the listing round-trip would serialize the first
+        # fetch of every project behind a single lock. A per-project
+        # lock lets listings of independent projects overlap while
+        # rows of the same project still fetch it only once.
+        with member_levels_lock:
+            project_lock = member_locks_by_project.setdefault(project_id, threading.Lock())
+        with project_lock:
+            if project_id not in member_levels_by_project:
+                member_levels_by_project[project_id] = {
+                    member.id: gitlab_get_access_level(member.access_level)
+                    for member in project.members.list(all=True, iterator=True)
+                }
+            return member_levels_by_project[project_id]
+
+    def add_member_one(entry, project):
+        if not (user := entries.as_gitlab_user(entry, glb, login_column)):
+            return
 
-def _project_add_member(project, user, access_level, logger):
-    if member := _project_get_member(project, user):
-        # If a member already exists with correct access level, do nothing,
-        # otherwise update the access level (project member attributes can
-        # be updated and saved).
-        existing_access_level = gitlab_get_access_level(member.access_level)
-        if existing_access_level == access_level:
+        project_path = project.path_with_namespace
+        existing_level = get_member_levels(project).get(user.id)
+        if existing_level == access_level:
             logger.debug(
-                "- Already exists with '%s' access, skipping.",
-                access_level.name
+                "%s already in %s with '%s' access, skipping.",
+                user.username, project_path, access_level.name
             )
             return
 
         logger.info(
-            "- Already exists with '%s' access, updating to '%s'.",
-            existing_access_level.name, access_level.name
+            "Adding %s (%s) to %s",
+            user.username, access_level.name, project_path
         )
-        member.access_level = access_level
-        member.save()
 
-    else:
-        # The user is not a member of the project, create a new member.
-        project.members.create({
-            'user_id': user.id,
-            'access_level': access_level,
-        })
+        if dry_run:
+            return
+
+        try:
+            if existing_level is None:
+                project.members.create({
+                    'user_id': user.id,
+                    'access_level': access_level,
+                })
+            else:
+                logger.info(
+                    "- Already exists with '%s' access, updating to '%s'.",
+                    existing_level.name, access_level.name
+                )
+                project.members.update(user.id, {'access_level': access_level})
+        except gitlab.GitlabError as exp:
+            logger.error("- Failed to add member: %s", exp)
+
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, allow_duplicates=True),
+        entries.concurrency,
+        add_member_one
+    )
 
 
 @register_command('remove-member', 'Remove project member')
@@ -1117,34 +1427,37 @@ def action_remove_member(
     Remove members from multiple projects.
     """
 
-    for entry, project in entries.as_gitlab_projects(glb, project_template, allow_duplicates=True):
+    def remove_member_one(entry, project):
         if user := entries.as_gitlab_user(entry, glb, login_column):
             logger.info(
                 "Removing %s from %s", user.username, project.path_with_namespace
             )
 
             if dry_run:
-                continue
+                return
 
             try:
                 _project_remove_member(project, user, logger)
             except gitlab.GitlabError as exp:
                 logger.error("- Failed to remove member: %s", exp)
 
-
-def _project_remove_member(project, user, logger):
-    if member := _project_get_member(project, user):
-        member.delete()
-    else:
-        logger.debug("- Member '%s' not found.", user.username)
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template, allow_duplicates=True),
+        entries.concurrency,
+        remove_member_one
+    )
 
 
-def _project_get_member(project, user):
+def _project_remove_member(project, user, logger):
+    # Delete directly instead of get-then-delete; a 404 simply means
+    # the user was not a member in the first place.
     try:
-        return project.members.get(user.id)
-    except gitlab.GitlabGetError:
-        # There is no such member in the project.
-        return None
+        project.members.delete(user.id)
+    except gitlab.GitlabDeleteError as exp:
+        if exp.response_code == http.HTTPStatus.NOT_FOUND:
+            logger.debug("- Member '%s' not found.", user.username)
+        else:
+            raise
 
 
 @register_command('project-settings', 'Change project settings')
@@ -1176,24 +1489,31 @@ def action_project_settings(
 
     change_description = description is not None
 
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
+    def change_settings_one(entry, project):
+        project_path = project.path_with_namespace
         if change_mr_default_target:
             is_self = project.mr_default_target_self
-            logger.debug("Project %s: mr_default_target_self=%s.", project.path_with_namespace, is_self)
+            logger.debug("Project %s: mr_default_target_self=%s.", project_path, is_self)
             if mr_default_target_is_self != is_self:
                 if not dry_run:
                     project.mr_default_target_self = mr_default_target_is_self
                     project.save()
-                logger.info("Changed default merge request target in %s to %s", project.path_with_namespace, mr_default_target)
+                logger.info("Changed default merge request target in %s to %s", project_path, mr_default_target)
             else:
-                logger.info("Default merge request target in %s is already set to %s", project.path_with_namespace, mr_default_target)
+                logger.info("Default merge request target in %s is already set to %s", project_path, mr_default_target)
         if change_description:
-            new_description = description.format(**entry)
+            new_description = description.format_map(entry)
             if not dry_run:
                 project.description = new_description
                 project.save()
             logger.info("Changed description to %s", new_description)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template),
+        entries.concurrency,
+        change_settings_one
+    )
+
 
 
 @register_command('get-file', 'Fetch given files')
@@ -1238,32 +1558,40 @@ def action_get_file(
     """
 
     commit_filter = get_commit_author_email_filter(blacklist)
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
+
+    def get_file_one(entry, project):
+        project_path = project.path_with_namespace
         try:
             last_commit = mg.get_commit_before_deadline(
                 glb, project, deadline, branch, commit_filter
             )
         except gitlab.exceptions.GitlabGetError:
-            logger.error("No matching commit in %s", project.path_with_namespace)
-            continue
+            logger.error("No matching commit in %s", project_path)
+            return
 
-        remote_file = remote_file_template.format(**entry)
+        remote_file = remote_file_template.format_map(entry)
         current_content = mg.get_file_contents(glb, project, last_commit.id, remote_file)
         if current_content is None:
             logger.error(
                 "File %s does not exist in %s",
-                remote_file, project.path_with_namespace
+                remote_file, project_path
             )
         else:
             logger.info(
                 "File %s in %s has %dB.",
-                remote_file, project.path_with_namespace, len(current_content)
+                remote_file, project_path, len(current_content)
             )
 
-            local_file = local_file_template.format(**entry)
+            local_file = local_file_template.format_map(entry)
             with open(local_file, "wb") as f:
                 f.write(current_content)
 
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template),
+        entries.concurrency,
+        get_file_one
+    )
+
 
 @register_command('put-file', 'Mass file upload')
 def action_put_file(
@@ -1323,51 +1651,75 @@ def action_put_file(
         logger.error("--force-commit and --once together does not make sense, aborting.")
         return
 
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
-        remote_file = remote_file_template.format(**entry)
+    # With a constant --from template many (or all) entries upload the
+    # same local file; read each unique path from disk only once.
+    local_content_by_path = {}
+    local_content_lock = threading.Lock()
+
+    def read_local_file(local_file):
+        with local_content_lock:
+            if local_file not in local_content_by_path:
+                local_content_by_path[local_file] = pathlib.Path(local_file).read_bytes()
+            return local_content_by_path[local_file]
+
+    def put_file_one(entry, project):
+        project_path = project.path_with_namespace
+        remote_file = remote_file_template.format_map(entry)
         extras = {
             'target_filename': remote_file,
         }
         commit_message = commit_message_template.format(GL=extras, **entry)
 
-        local_file = local_file_template.format(**entry)
+        local_file = local_file_template.format_map(entry)
         try:
-            local_file_content = pathlib.Path(local_file).read_text()
+            # Read as bytes: the remote content comes back as bytes too,
+            # so the comparison needs no re-encoding pass.
+            local_file_content = read_local_file(local_file)
         except FileNotFoundError:
             if skip_missing_file:
-                logger.error("Skipping %s as %s is missing.", project.path_with_namespace, local_file)
-                continue
+                logger.error("Skipping %s as %s is missing.", project_path, local_file)
+                return
             else:
                 raise
 
         commit_needed = force_commit
-        already_exists = False
         if not force_commit:
-            remote_file_content = mg.get_file_contents(glb, project, branch, remote_file)
-            already_exists = remote_file_content is not None
-            if already_exists:
-                commit_needed = remote_file_content != local_file_content.encode('utf-8')
-            else:
-                commit_needed = True
-
-        if commit_needed:
+            # Compare checksums: a HEAD request is enough to decide
+            # whether the upload is needed, no content download.
+            remote_sha256 = mg.get_file_sha256(glb, project, branch, remote_file)
+            already_exists = remote_sha256 is not None
             if already_exists and only_once:
+                # Mere existence settles --once, skip the comparison.
                 logger.info(
                     "Not overwriting %s at %s.",
-                    local_file, project.path_with_namespace
+                    local_file, project_path
                 )
+                return
+            if already_exists:
+                local_sha256 = hashlib.sha256(local_file_content).hexdigest()
+                commit_needed = remote_sha256 != local_sha256
             else:
-                logger.info(
-                    "Uploading %s to %s as %s",
-                    local_file, project.path_with_namespace, remote_file
-                )
+                commit_needed = True
+
+        if commit_needed:
+            logger.info(
+                "Uploading %s to %s as %s",
+                local_file, project_path, remote_file
+            )
             if not dry_run:
                 mg.put_file(
                     glb, project, branch, remote_file,
-                    local_file_content, not only_once, commit_message
+                    local_file_content.decode('utf-8'), not only_once,
+                    commit_message
                 )
         else:
-            logger.info("No change in %s at %s.", local_file, project.path_with_namespace)
+            logger.info("No change in %s at %s.", local_file, project_path)
+
+    for_each_concurrently(
+        entries.as_gitlab_projects(glb, project_template),
+        entries.concurrency,
+        put_file_one
+    )
 
 
 @register_command('get-last-pipeline', 'Get last pipeline status')
@@ -1386,18 +1738,23 @@ def action_get_last_pipeline(
     Get pipeline status of multiple projects.
     """
 
-    result = {}
-    pipeline_states_only = []
-    for _, project in entries.as_gitlab_projects(glb, project_template):
-        pipelines = project.pipelines.list(iterator=True)
+    # There is no batched (GraphQL-style) pipeline query available over
+    # the REST API, so overlap the per-project round-trips instead and
+    # assemble the output in the original entry order afterwards.
+    pairs = list(entries.as_gitlab_projects(glb, project_template))
+    result_by_path = {}
+
+    def fetch_last_pipeline(_, project):
+        project_path = project.path_with_namespace
+        # Only the most recent pipeline is inspected, so fetch exactly one.
+        pipelines = project.pipelines.list(per_page=1, iterator=True)
         last_pipeline = next(pipelines, None)
 
         if not last_pipeline:
-            result[project.path_with_namespace] = {
+            result_by_path[project_path] = {
                 "status": "none"
             }
-            pipeline_states_only.append("none")
-            continue
+            return
 
         entry = {
             "status": last_pipeline.status,
@@ -1405,22 +1762,34 @@ def action_get_last_pipeline(
             "commit": last_pipeline.sha,
             "jobs": [],
         }
-        pipeline_states_only.append(last_pipeline.status)
 
-        for job in last_pipeline.jobs.list(iterator=True):
-            entry["jobs"].append({
-                "status": job.status,
-                "id": job.id,
-                "name": job.name,
-            })
+        # The summary prints overall states only; skip the extra
+        # per-project job listing that nobody would read.
+        if not summary_only:
+            for job in last_pipeline.jobs.list(per_page=100, include_retried=False, iterator=True):
+                entry["jobs"].append({
+                    "status": job.status,
+                    "id": job.id,
+                    "name": job.name,
+                })
+
+        result_by_path[project_path] = entry
 
-        result[project.path_with_namespace] = entry
+    for_each_concurrently(pairs, entries.concurrency, fetch_last_pipeline)
+
+    result = {}
+    summary_by_overall_status = collections.Counter()
+    for _, project in pairs:
+        project_path = project.path_with_namespace
+        entry = result_by_path[project_path]
+        result[project_path] = entry
+        summary_by_overall_status[entry["status"]] += 1
 
     if summary_only:
-        summary_by_overall_status = collections.Counter(pipeline_states_only)
-        states_len = len(pipeline_states_only)
+        # Not Counter.total(): that needs Python 3.10 and we support 3.8.
+        states_len = sum(summary_by_overall_status.values())
         for state, count in summary_by_overall_status.most_common():
-            print("{}: {} ({:.0f}%)".format(state, count, 100 * count / states_len))
+            print(f"{state}: {count} ({100 * count / states_len:.0f}%)")
         print(f"total: {states_len}")
     else:
         print(json.dumps(result, indent=4))
@@ -1443,31 +1812,48 @@ def action_get_pipeline_at_commit(
     commit while ignoring skipped pipelines.
     """
 
-    result = {}
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
-        commit_sha = commit_template.format(**entry) if commit_template else None
+    # As with get-last-pipeline, overlap the per-project round-trips and
+    # assemble the output in the original entry order afterwards.
+    pairs = list(entries.as_gitlab_projects(glb, project_template))
+    result_by_path = {}
+
+    def fetch_pipeline_at_commit(entry, project):
+        commit_sha = commit_template.format_map(entry) if commit_template else None
 
-        found_commit = False
         found_pipeline = None
-        for pipeline in project.pipelines.list(iterator=True):
-            if not commit_sha:
-                found_commit = True
-            elif pipeline.sha == commit_sha:
-                found_commit = True
+        if commit_sha:
+            # Let the server filter the pipelines of the commit itself;
+            # the client-side history walk below is only needed when
+            # they are all skipped (or missing) and an older pipeline
+            # has to be used instead.
+            for pipeline in project.pipelines.list(sha=commit_sha, per_page=100, iterator=True):
+                if pipeline.status != "skipped":
+                    found_pipeline = pipeline
+                    break
 
-            if not found_commit:
-                continue
+        if not found_pipeline:
+            found_commit = False
+            # The walk may go deep into the history, use full pages to
+            # minimize the number of pagination round-trips.
+            for pipeline in project.pipelines.list(per_page=100, iterator=True):
+                if not commit_sha:
+                    found_commit = True
+                elif pipeline.sha == commit_sha:
+                    found_commit = True
+
+                if not found_commit:
+                    continue
 
-            if pipeline.status != "skipped":
-                found_pipeline = pipeline
-                break
+                if pipeline.status != "skipped":
+                    found_pipeline = pipeline
+                    break
 
         if not found_pipeline:
-            entry = {
+            status = {
                 "status": "none"
             }
         else:
-            entry = {
+            status = {
                 "status": found_pipeline.status,
                 "id": found_pipeline.id,
                 "commit": found_pipeline.sha,
@@ -1477,15 +1863,31 @@ def action_get_pipeline_at_commit(
                         "id": job.id,
                         "name": job.name,
                     }
-                    for job in found_pipeline.jobs.list(iterator=True)
+                    for job in found_pipeline.jobs.list(per_page=100, include_retried=False, iterator=True)
                 ],
             }
 
-        result[project.path_with_namespace] = entry
+        result_by_path[project.path_with_namespace] = status
+
+    for_each_concurrently(pairs, entries.concurrency, fetch_pipeline_at_commit)
 
+    result = {
+        project.path_with_namespace: result_by_path[project.path_with_namespace]
+        for _, project in pairs
+    }
     print(json.dumps(result, indent=4))
 
 
+class _MissingCommit:
+    """
+    Placeholder for projects without a matching deadline commit.
+    """
+    id = '0' * 40
+
+
+_MISSING_COMMIT = _MissingCommit()
+
+
 @register_command('deadline-commit', 'Get commits for a deadline')
 def action_deadline_commits(
     glb: GitlabInstanceParameter(),
@@ -1539,30 +1941,41 @@ def action_deadline_commits(
     Get last commits before deadline.
     """
 
-    output = open(output_filename, 'w') if output_filename else sys.stdout
-    print(output_header, file=output)
-
     commit_filter = get_commit_author_email_filter(blacklist)
-    for entry, project in entries.as_gitlab_projects(glb, project_template):
-        prefer_tag = prefer_tag_template.format(**entry) if prefer_tag_template else None
-        branch = branch_template.format(**entry)
+
+    # Resolve the per-project commits concurrently, then render the rows
+    # in the original entry order.
+    pairs = list(entries.as_gitlab_projects(glb, project_template))
+    commit_by_path = {}
+
+    def fetch_deadline_commit(entry, project):
+        prefer_tag = prefer_tag_template.format_map(entry) if prefer_tag_template else None
+        branch = branch_template.format_map(entry)
         try:
             last_commit = mg.get_commit_before_deadline(
                 glb, project, deadline, branch, commit_filter, prefer_tag
             )
         except gitlab.exceptions.GitlabGetError:
-            class CommitMock:
-                def __init__(self, commit_id):
-                    self.id = commit_id
-
-            last_commit = CommitMock('0000000000000000000000000000000000000000')
+            last_commit = _MISSING_COMMIT
 
         logger.debug("%s at %s", project.path_with_namespace, last_commit.id)
-        line = output_template.format(commit=last_commit, **entry)
-        print(line, file=output)
+        commit_by_path[project.path_with_namespace] = last_commit
+
+    for_each_concurrently(pairs, entries.concurrency, fetch_deadline_commit)
+
+    # Collect the rows first and write them out in one call: the output
+    # is tiny compared to the API traffic and this keeps a partially
+    # written file from appearing when a lookup fails midway.
+    lines = [output_header + '\n']
+    for entry, project in pairs:
+        last_commit = commit_by_path[project.path_with_namespace]
+        lines.append(output_template.format(commit=last_commit, **entry) + '\n')
 
     if output_filename:
-        output.close()
+        with open(output_filename, 'w') as output:
+            output.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
 
 
 @register_command('commit-stats', 'Get basic commit statistics')
@@ -1575,13 +1988,18 @@ def action_commit_stats(
     Get basic added/removed lines for projects.
     """
 
-    result = []
+    # Emit the JSON array incrementally, one project at a time, so the
+    # commit history of all projects is never held in memory at once.
+    output = sys.stdout
+    output.write('[\n')
+    first = True
     for _, project in entries.as_gitlab_projects(glb, project_template):
-        commits = project.commits.list(all=True, iterator=True)
+        # with_stats makes the listing carry the line statistics, so no
+        # per-commit detail fetch is needed.
+        commits = project.commits.list(all=True, with_stats=True, iterator=True)
         commit_details = {}
-        for c in commits:
-            info = project.commits.get(c.id)
-            commit_details[c.id] = {
+        for info in commits:
+            commit_details[info.id] = {
                 'parents': info.parent_ids,
                 'subject': info.title,
                 'line_stats': info.stats,
@@ -1589,12 +2007,15 @@ def action_commit_stats(
                 'author_date': info.authored_date,
             }
 
-        result.append({
+        if not first:
+            output.write(',\n')
+        first = False
+        json.dump({
             'project': project.path_with_namespace,
             'commits': commit_details,
-        })
+        }, output, indent=4)
 
-    print(json.dumps(result, indent=4))
+    output.write('\n]\n')
 
 
 @register_command('help-markdown', 'Generate Markdown documentation for all commands.')
@@ -5,17 +5,43 @@
 Helper GitLab functions.
 """
 
-import base64
+import hashlib
 import http
+import json
 import logging
 import os
 import pathlib
 import subprocess
+import threading
 import time
 
 import gitlab
 import requests
 
+_retry_logger = logging.getLogger('retry_on_exception')
+
+
+def tune_connection_pool(session, pool_size):
+    """
+    Enlarge the HTTP connection pool of a requests session.
+
+    python-gitlab reuses one requests.Session (i.e. keep-alive is
+    already in effect), but the default urllib3 pool keeps only a
+    handful of connections alive. With concurrent bulk actions the
+    extra connections would be torn down and reopened over and over,
+    paying the TCP/TLS handshake each time.
+
+    :param session: requests.Session used by the GitLab instance.
+    :param pool_size: number of connections to keep alive.
+    """
+
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
 
 def retries(
     n=None,
@@ -60,7 +86,6 @@ def retry_on_exception(message, exceptions):
             """
             Wrapper calling the original function.
             """
-            logger = logging.getLogger('retry_on_exception')
             last_ex = None
             for _ in retries(6, timeout=240):
                 try:
@@ -70,9 +95,9 @@ def retry_on_exception(message, exceptions):
                         if isinstance(ex, allowed):
                             last_ex = ex
                             if '%s' in message:
-                                logger.warning(message, ex)
+                                _retry_logger.warning(message, ex)
                             else:
-                                logger.warning(message)
+                                _retry_logger.warning(message)
                             continue
                     if not last_ex:
                         raise ex
@@ -84,20 +109,110 @@ def retry_on_exception(message, exceptions):
     return decorator
 
 
+class LookupCache:
+    """
+    On-disk cache for project and user lookup results.
+
+    The tool is typically invoked repeatedly over the same roster and
+    project set and each invocation re-resolves identical lookups.
+    Caching the raw object attributes locally skips those round-trips
+    entirely on later invocations. Records expire after a TTL because
+    cached objects may be stale (e.g. renamed projects).
+    """
+
+    DEFAULT_TTL = 3600
+
+    def __init__(self, cache_file, ttl=DEFAULT_TTL):
+        self.cache_file = pathlib.Path(cache_file)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('lookup-cache')
+        try:
+            self.records = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            self.records = {}
+
+    def get(self, kind, key):
+        """
+        Return cached attributes or None when missing or expired.
+        """
+        with self.lock:
+            record = self.records.get(kind, {}).get(str(key))
+        if not record:
+            return None
+        if time.time() - record['stored_at'] > self.ttl:
+            return None
+        return record['attributes']
+
+    def put(self, kind, key, attributes):
+        """
+        Store object attributes and persist the cache to disk.
+        """
+        with self.lock:
+            self.records.setdefault(kind, {})[str(key)] = {
+                'stored_at': time.time(),
+                'attributes': attributes,
+            }
+            try:
+                tmp_file = self.cache_file.with_suffix('.tmp')
+                tmp_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file.write_text(json.dumps(self.records))
+                os.replace(tmp_file, self.cache_file)
+            except OSError as exp:
+                self.logger.warning("Unable to save lookup cache: %s", exp)
+
+
+_lookup_caches = {}
+_lookup_caches_lock = threading.Lock()
+
+
+def get_lookup_cache(glb):
+    """
+    Return the on-disk lookup cache for a GitLab instance or None.
+
+    The cache is opt-in: it is enabled by pointing the
+    TEACHERS_GITLAB_CACHE_DIR environment variable to a directory.
+    Each instance gets its own cache file because project and user
+    ids are only meaningful within one instance: replaying ids cached
+    on one instance against another would redirect later write
+    operations to unrelated projects.
+
+    :param glb: GitLab instance the lookups are made against.
+    """
+
+    cache_dir = os.environ.get('TEACHERS_GITLAB_CACHE_DIR')
+    if not cache_dir:
+        return None
+    instance_url = glb.api_url
+    with _lookup_caches_lock:
+        if instance_url not in _lookup_caches:
+            instance_tag = hashlib.sha256(instance_url.encode('utf-8')).hexdigest()[:16]
+            _lookup_caches[instance_url] = LookupCache(
+                pathlib.Path(cache_dir) / 'lookups-{}.json'.format(instance_tag)
+            )
+        return _lookup_caches[instance_url]
+
+
 @retry_on_exception(
     'Failed to canonicalize a project, will retry...',
     [requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout, gitlab.exceptions.GitlabHttpError]
 )
-def get_canonical_project(glb, project):
+def get_canonical_project(glb, project, cache=None):
     """
     Ensure we have an instance of gitlab.*.Project.
 
     :param glb: GitLab instance.
     :param project: Either object already or path or project id.
+    :param cache: Optional LookupCache to avoid the API round-trip.
     """
 
     if isinstance(project, (int, str)):
-        return glb.projects.get(project)
+        if cache and (attributes := cache.get('projects', project)):
+            return gitlab.v4.objects.Project(glb.projects, attributes)
+        result = glb.projects.get(project)
+        if cache:
+            cache.put('projects', project, result.attributes)
+        return result
     if isinstance(project, gitlab.v4.objects.Project):
         return project
     raise Exception("Unexpected object type.")
@@ -236,6 +351,28 @@ def put_file(glb, project, branch, file_path, file_contents, overwrite, commit_m
             raise
 
 
+@retry_on_exception(
+    'Failed to get file metadata, will retry...',
+    [requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout]
+)
+def get_file_sha256(glb, project, branch, file_path):
+    """
+    Return the content SHA256 of a remote file or None when it does not exist.
+
+    A HEAD request carries the checksum in the response headers, so
+    change detection does not need to download the content at all.
+    """
+
+    project = get_canonical_project(glb, project)
+    try:
+        headers = project.files.head(file_path, ref=branch)
+    except gitlab.exceptions.GitlabHeadError as exp:
+        if exp.response_code == http.HTTPStatus.NOT_FOUND:
+            return None
+        raise
+    return headers.get('X-Gitlab-Content-Sha256')
+
+
 @retry_on_exception(
     'Failed to get file, will retry...',
     [requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout, gitlab.exceptions.GitlabHttpError]
@@ -243,22 +380,20 @@ def put_file(glb, project, branch, file_path, file_contents, overwrite, commit_m
 def get_file_contents(glb, project, branch, file_path):
     """
     Retrieve current file contents on a GitLab repository.
+
+    Returns the raw bytes or None when the file does not exist.
     """
 
     project = get_canonical_project(glb, project)
-    base_filename = os.path.basename(file_path)
-    files = project.repository_tree(
-        path=os.path.dirname(file_path),
-        ref=branch,
-        all=True,
-        as_list=False
-    )
-    current_file = [f for f in files if f['name'] == base_filename]
-    if not current_file:
-        return None
-    file_info = project.repository_blob(current_file[0]['id'])
-    content = base64.b64decode(file_info['content'])
-    return content
+    # The raw-file endpoint answers in one round-trip; the previous
+    # implementation listed the whole directory tree (paginated) and
+    # then fetched the blob separately.
+    try:
+        return project.files.raw(file_path=file_path, ref=branch)
+    except (gitlab.exceptions.GitlabGetError, gitlab.exceptions.GitlabHttpError) as exp:
+        if exp.response_code == http.HTTPStatus.NOT_FOUND:
+            return None
+        raise
 
 
 def get_timestamp(ts):
@@ -298,10 +433,13 @@ def get_commit_with_tag(glb, project, tag_name):
 
 
 def get_commit_before_deadline(
-    glb, project, deadline, branch, commit_filter=lambda commit: True, tag=None
+    glb, project, deadline, branch, commit_filter=None, tag=None
 ):
     """
     Get last commit just before the deadline but prefer a tag if available.
+
+    :param commit_filter: optional client-side commit predicate; without
+        it only a single commit is fetched from the server.
     """
     project = get_canonical_project(glb, project)
     if tag:
@@ -316,16 +454,28 @@ def get_commit_before_deadline(
 
     # By default, commits are ordered in reverse chronological order, i.e.,
     # the most recent first. We therefore take the first matching commit.
-    commits = project.commits.list(ref_name=branch, until=deadline.isoformat(), iterator=True)
-    if commit := next(filter(commit_filter, commits), None):
+    # The deadline is enforced server-side through 'until'; without a
+    # client-side filter the first commit is the answer and there is no
+    # point in transferring a whole page of them.
+    if commit_filter:
+        commits = project.commits.list(ref_name=branch, until=deadline.isoformat(), iterator=True)
+        commit = next(filter(commit_filter, commits), None)
+    else:
+        commits = project.commits.list(
+            ref_name=branch, until=deadline.isoformat(), per_page=1, iterator=True
+        )
+        commit = next(commits, None)
+    if commit:
         return commit
 
     raise gitlab.exceptions.GitlabGetError("No matching commit found.")
 
 
-def clone_or_fetch(glb, project, local_path):
+def clone_or_fetch(glb, project, local_path, depth=None):
     """
     Clone or update (fetch) to a local repository.
+
+    :param depth: optional shallow-clone depth (full history without it).
     """
     if os.path.isdir(os.path.join(local_path, '.git')):
         rc = subprocess.call(['git', 'fetch'], cwd=local_path)
@@ -341,11 +491,40 @@ def clone_or_fetch(glb, project, local_path):
 
     project = get_canonical_project(glb, project)
     git_url = project.ssh_url_to_repo
-    rc = subprocess.call(['git', 'clone', git_url, local_path])
+    command = ['git', 'clone']
+    if depth:
+        # --depth implies --single-branch which would hide commits on
+        # other branches from the later reset; keep all branch tips.
+        command.extend(['--depth', str(depth), '--no-single-branch'])
+    command.extend([git_url, local_path])
+    rc = subprocess.call(command)
     if rc != 0:
         raise Exception("git clone failed")
 
 
+def is_shallow_repository(local_path):
+    """
+    Tell whether a local repository is a shallow clone.
+    """
+    result = subprocess.run(
+        ['git', 'rev-parse', '--is-shallow-repository'],
+        cwd=local_path,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    return (result.returncode == 0) and (result.stdout.strip() == 'true')
+
+
+def unshallow(local_path):
+    """
+    Fetch the full history of a shallow local repository.
+    """
+    rc = subprocess.call(['git', 'fetch', '--unshallow'], cwd=local_path)
+    if rc != 0:
+        raise Exception("git fetch --unshallow failed")
+
+
 def reset_to_commit(local_path, commit):
     """
     Reset a local repository to a given commit.
@@ -1,7 +1,8 @@
 
 class MockEntries:
-    def __init__(self, entries):
+    def __init__(self, entries, concurrency=1):
         self.entries = entries
+        self.concurrency = concurrency
 
     def as_gitlab_users(self, _glb, login_column):
         for entry in self.entries:
@@ -6,6 +6,8 @@ import re
 import gitlab
 import responses
 
+_UNKNOWN_URL_RE = re.compile(r"^http://localhost/api/v4/.*")
+
 class MockedGitLabApi:
     def __init__(self, rsps, check_reporting_unknowns=True):
         self.base_url = "http://localhost/"
@@ -29,7 +31,7 @@ class MockedGitLabApi:
         for m in methods:
             self.responses.add_callback(
                 m,
-                re.compile("http://localhost/api/v4/.*"),
+                _UNKNOWN_URL_RE,
                 callback=dumping_callback,
             )
         for i, _ in enumerate(methods):
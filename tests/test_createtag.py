@@ -7,10 +7,8 @@ def test_create_tag_that_does_not_exist(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(452, 'student/alpha')
-
     mock_gitlab.on_api_post(
-        'projects/452/repository/tags',
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/repository/tags',
         request_json={
             'ref': '',
             'tag_name': 'tag1'
@@ -36,10 +34,8 @@ def test_create_existing_tag(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(452, 'student/alpha')
-
     mock_gitlab.on_api_post(
-        'projects/452/repository/tags',
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/repository/tags',
         request_json={
             'ref': 'double',
             'tag_name': 'tag2'
@@ -8,15 +8,13 @@ def test_protect_tag_with_no_response(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(452, 'student/alpha')
-
     mock_gitlab.on_api_get(
-        'projects/452/protected_tags/tag1',
-        response_404=True,
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags',
+        response_json=[],
     )
 
     mock_gitlab.on_api_post(
-        'projects/452/protected_tags',
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags',
         request_json={
             'name': 'tag1',
             'create_access_level': 'devel'
@@ -41,20 +39,20 @@ def test_protect_tag_with_normal_access_level(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(452, 'student/alpha')
-
     mock_gitlab.on_api_get(
-        'projects/452/protected_tags/tag1',
-        response_json={
-             'name': 'tag1',
-             'create_access_levels': [
-                 {
-                     'id': 1,
-                     'access_level': 30,
-                     'access_level_description': 'Developers'
-                 }
-             ],
-         },
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags',
+        response_json=[
+            {
+                'name': 'tag1',
+                'create_access_levels': [
+                    {
+                        'id': 1,
+                        'access_level': 30,
+                        'access_level_description': 'Developers'
+                    }
+                ],
+            },
+        ],
     )
 
     mock_gitlab.report_unknown()
@@ -73,28 +71,28 @@ def test_protect_tag_that_needs_access_level_change(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(452, 'student/alpha')
-
     mock_gitlab.on_api_get(
-        'projects/452/protected_tags/tag1',
-        response_json={
-             'name': 'tag1',
-             'create_access_levels': [
-                 {
-                     'id': 1,
-                     'access_level': 30,
-                     'access_level_description': 'Maintainers'
-                 }
-             ],
-         },
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags',
+        response_json=[
+            {
+                'name': 'tag1',
+                'create_access_levels': [
+                    {
+                        'id': 1,
+                        'access_level': 30,
+                        'access_level_description': 'Maintainers'
+                    }
+                ],
+            },
+        ],
     )
 
     mock_gitlab.on_api_delete(
-        'projects/452/protected_tags/tag1',
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags/tag1',
     )
 
     mock_gitlab.on_api_post(
-        'projects/452/protected_tags',
+        'projects/' + mock_gitlab.escape_path_in_url('student/alpha') + '/protected_tags',
         request_json={
             "name": "tag1",
             "create_access_level": 40
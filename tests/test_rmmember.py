@@ -28,13 +28,16 @@ def test_remove_member_that_doesnt_exist(mock_gitlab):
         }]
     )
 
-    mock_gitlab.on_api_get(
+    mock_gitlab.on_api_delete(
         'projects/42/members/5',
-        response_404=True
+        status=404,
+        json={
+            "message": "404 Not Found",
+        },
     )
 
     mock_gitlab.on_api_get(
-        'users?username=alpha',
+        'users?username=alpha&per_page=1',
         response_json=[
             {
                 'id': 5,
@@ -81,13 +84,7 @@ def test_remove_member(mock_gitlab):
     )
 
     mock_gitlab.on_api_get(
-        'projects/42/members/2157753',
-        response_json={
-        }
-    )
-
-    mock_gitlab.on_api_get(
-        'users?username=mario',
+        'users?username=mario&per_page=1',
         response_json=[
             {
                 'id': 2157753,
@@ -97,7 +94,7 @@ def test_remove_member(mock_gitlab):
     )
 
     mock_gitlab.on_api_delete(
-       'projects/42/members'
+       'projects/42/members/2157753'
     )
 
     mock_gitlab.report_unknown()
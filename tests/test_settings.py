@@ -1,81 +1,79 @@
 import logging
 
+import pytest
+
 import teachers_gitlab.main as tg
 
+_SETTINGS_LOGGER = logging.getLogger('settings')
+
 
-def test_project_settings_changing_everything(mock_gitlab):
-    entries = [
+CASE_CHANGING_EVERYTHING = {
+    'entries': [
         {
             'login': 'alpha',
             'name': 'Alpha Able'
         },
-    ]
-
-    mock_gitlab.register_project(42, 'student/alpha', mr_default_target_self='self')
-
-    mock_gitlab.on_api_put(
-        'projects/42',
-        request_json= {
+    ],
+    'project_id': 42,
+    'project_path': 'student/alpha',
+    'put_requests': [
+        {
             'mr_default_target_self': True,
         },
-        response_json={
-            'id': 42,
-            'path_with_namespace': 'student/alpha',
-        }
-    )
-
-    mock_gitlab.on_api_put(
-        'projects/42',
-        request_json= {
+        {
             'description': 'Semestral project for Alpha Able',
         },
-        response_json={
-            'id': 42,
-            'path_with_namespace': 'student/alpha',
-        }
-    )
-
-    mock_gitlab.report_unknown()
-
-    tg.action_project_settings(
-        mock_gitlab.get_python_gitlab(),
-        logging.getLogger('settings'),
-        tg.ActionEntries(entries),
-        False,
-        'student/{login}',
-        'self',
-        'Semestral project for {name}'
-    )
-
+    ],
+    'mr_default_target': 'self',
+    'description': 'Semestral project for {name}',
+}
 
-
-def test_project_settings_changing_only_name(mock_gitlab):
-    entries = [
+CASE_CHANGING_ONLY_NAME = {
+    'entries': [
         {'login': 'beta'},
-    ]
-
-    mock_gitlab.register_project(38, 'student/beta', mr_default_target_self='self')
-
-    mock_gitlab.on_api_put(
-        'projects/38',
-        request_json= {
+    ],
+    'project_id': 38,
+    'project_path': 'student/beta',
+    'put_requests': [
+        {
             'description': 'The best project',
         },
-        response_json={
-            'id': 38,
-            'path_with_namespace': 'student/beta',
-        }
+    ],
+    'mr_default_target': None,
+    'description': 'The best project',
+}
+
+
+@pytest.mark.parametrize(
+    'case',
+    [CASE_CHANGING_EVERYTHING, CASE_CHANGING_ONLY_NAME],
+    ids=['changing_everything', 'changing_only_name'],
+)
+def test_project_settings(mock_gitlab, case):
+    mock_gitlab.register_project(
+        case['project_id'],
+        case['project_path'],
+        mr_default_target_self='self',
     )
 
-    mock_gitlab.report_unknown()
+    for put_request in case['put_requests']:
+        mock_gitlab.on_api_put(
+            'projects/{}'.format(case['project_id']),
+            request_json=put_request,
+            response_json={
+                'id': case['project_id'],
+                'path_with_namespace': case['project_path'],
+            }
+        )
 
+    mock_gitlab.report_unknown()
 
     tg.action_project_settings(
         mock_gitlab.get_python_gitlab(),
-        logging.getLogger('settings'),
-        tg.ActionEntries(entries),
+        _SETTINGS_LOGGER,
+        tg.ActionEntries(case['entries']),
         False,
         'student/{login}',
-        None,
-        'The best project'
+        case['mr_default_target'],
+        case['description'],
     )
@@ -10,35 +10,35 @@ def test_unprotect_branch(mock_gitlab):
     ]
 
     # This project does not have the branch protected, hence
-    # we return 404 about it and we do not expect a DELETE request
-    mock_gitlab.register_project(101, 'course/one-able')
+    # we return an empty listing and we do not expect a DELETE request
     mock_gitlab.on_api_get(
-        'projects/101/protected_branches/devel',
-        response_404=True,
+        'projects/' + mock_gitlab.escape_path_in_url('course/one-able') + '/protected_branches',
+        response_json=[],
     )
 
     # The second project still has the branch under protection
     # so we need to provide details and we expect the protection to be
     # lifted via a DELETE request
-    mock_gitlab.register_project(102, 'course/two-baker')
     mock_gitlab.on_api_get(
-        'projects/102/protected_branches/devel',
-        response_json={
-            'id': 1,
-            'name': 'devel',
-            'push_access_levels': [
-                {
-                    'id': 1,
-                    'access_level': 30,
-                    'access_level_description': "Developers + Maintainers",
-                },
-            ],
-            'merge_access_levels': [],
-            'allow_force_push': False,
-        },
+        'projects/' + mock_gitlab.escape_path_in_url('course/two-baker') + '/protected_branches',
+        response_json=[
+            {
+                'id': 1,
+                'name': 'devel',
+                'push_access_levels': [
+                    {
+                        'id': 1,
+                        'access_level': 30,
+                        'access_level_description': "Developers + Maintainers",
+                    },
+                ],
+                'merge_access_levels': [],
+                'allow_force_push': False,
+            },
+        ],
     )
     mock_gitlab.on_api_delete(
-        'projects/102/protected_branches/devel',
+        'projects/' + mock_gitlab.escape_path_in_url('course/two-baker') + '/protected_branches/devel',
     )
 
     # Perform the unprotection
@@ -58,27 +58,28 @@ def test_unprotect_branch_with_complex_name(mock_gitlab):
         {'login': 'alpha'},
     ]
 
-    mock_gitlab.register_project(20, 'forks/alpha')
-
     mock_gitlab.on_api_get(
-        'projects/20/protected_branches/' + mock_gitlab.escape_path_in_url('feature/*'),
-        response_json={
-            'id': 1,
-            'name': 'feature/*',
-            'push_access_levels': [
-                {
-                    'id': 1,
-                    'access_level': 30,
-                    'access_level_description': "Developers + Maintainers",
-                },
-            ],
-            'merge_access_levels': [],
-            'allow_force_push': False,
-        },
+        'projects/' + mock_gitlab.escape_path_in_url('forks/alpha') + '/protected_branches',
+        response_json=[
+            {
+                'id': 1,
+                'name': 'feature/*',
+                'push_access_levels': [
+                    {
+                        'id': 1,
+                        'access_level': 30,
+                        'access_level_description': "Developers + Maintainers",
+                    },
+                ],
+                'merge_access_levels': [],
+                'allow_force_push': False,
+            },
+        ],
     )
 
     mock_gitlab.on_api_delete(
-        'projects/20/protected_branches/' + mock_gitlab.escape_path_in_url('feature/*')
+        'projects/' + mock_gitlab.escape_path_in_url('forks/alpha')
+        + '/protected_branches/' + mock_gitlab.escape_path_in_url('feature/*')
     )
 
     mock_gitlab.report_unknown()